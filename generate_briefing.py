@@ -6,154 +6,534 @@ commits it to the GitHub repo as briefing.json
 Runs every 60 minutes.
 """
 
-import json, time, urllib.request, urllib.parse, subprocess, os, sys
+import base64
+import hashlib
+import json, re, time, subprocess, os, sys
+import socket
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from io import BytesIO
+
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+    def _json_dumps_bytes(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    _json_loads = json.loads
+    def _json_dumps_bytes(obj):
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode()
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+try:
+    from lxml import etree
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
 
 GITHUB_TOKEN = None  # loaded from git config
 REPO = "Rpike623/mil-tracker"
 OPENROUTER_KEY = os.environ.get("OPENROUTER_API_KEY", "")
+REPO_DIR = "/root/.openclaw/workspace/mil-tracker"
 BRIEFING_FILE = "/root/.openclaw/workspace/mil-tracker/briefing.json"
+LAST_SHA_FILE = "/root/.openclaw/.last_briefing_sha"
+AI_CACHE_FILE = os.path.expanduser("~/.openclaw/briefing_cache.json")
+AI_CACHE_TTL = 3300        # just under the 60-minute cycle
+AI_CACHE_EVICT = 86400     # drop entries older than 24h
+
+# Static analyst instructions, kept byte-identical across calls so the
+# prompt prefix stays cacheable server-side. Sized past Anthropic's
+# 1024-token minimum cacheable prefix — below that the cache_control
+# breakpoint is silently ignored. Volatile data goes in the user message.
+STATIC_ANALYST_INSTRUCTIONS = """You are a military OSINT analyst. Generate a concise, objective intelligence briefing based on the live data supplied by the user. Be analytical, not alarmist. Use plain language. No markdown headers — just 3-4 short paragraphs. Be specific about numbers and locations.
+
+The user message contains: live military aircraft counts by country and type, adversary aircraft currently visible on ADS-B, active alert zones, and recent news headlines.
+
+DATA PROVENANCE AND LIMITS:
+- Positions come from crowdsourced ADS-B receivers. Coverage is dense over North America, Europe, and East Asia; thin over open ocean, the interiors of Russia and China, and active conflict zones where receivers are scarce.
+- Military aircraft broadcast selectively. Routine logistics, tanker, and training flights usually broadcast; strike packages and sensitive ISR missions usually do not. Treat visible traffic as the floor of actual activity, never the ceiling.
+- Country attribution is derived from ICAO 24-bit hex allocations. These identify the state of registry, not the operator, and a small number of airframes fly with spoofed or misconfigured codes; the "unknown" bucket reflects unparseable transponder data.
+- Type classification is keyed on reported airframe type codes. Aircraft that omit the type field land in "other" and may still be significant.
+
+HOW TO READ THE INDICATORS:
+- Tankers: the clearest logistics tell. Two or fewer airborne is routine; three or more, especially concentrated near one theater, suggests extended-range operations underway or being prepared. Tanker surges typically precede strike packages or long-duration ISR missions by several hours.
+- ISR/Recon: elevated collection typically indicates active target acquisition, pattern-of-life work, or battle damage assessment. Note which theater the collection clusters in.
+- Bombers: high-visibility signals. Distinguish scheduled deterrence patrols (solo or paired, along established routes) from surges (multiple airframes with tanker support), which may indicate signaling or pre-strike positioning.
+- Fighters: day-to-day counts are noisy; what matters is clustering near an alert zone or escort of bombers and ISR aircraft.
+- Transports: sustained lift into one region suggests a buildup or rotation; a single flight is routine.
+
+COUNTRY BASELINES:
+- US: normally the large majority of visible military traffic. Deviations in composition — an unusual tanker or ISR share — matter more than the raw total.
+- Russia: visible traffic is mostly IL-76 transport and patrol types. Tu-95/Tu-160 sorties toward NATO airspace or Japan are deliberate signaling and usually draw intercepts.
+- China: visible activity concentrates near the Taiwan Strait and South China Sea; H-6 sorties into the Taiwan ADIZ are pressure operations and worth calling out individually.
+- Iran: domestic military flights rarely broadcast, so any visible Iranian military aircraft is itself notable.
+- Allied: NATO and partner forces, including standing AWACS orbits on NATO's eastern flank; their absence would itself be notable.
+
+ALERT ZONES: the monitored boxes are the Strait of Hormuz, Persian Gulf, Taiwan Strait, South China Sea, and Black Sea — standing friction points for US-Iran escalation and shipping, US-China posture, and the Russia-Ukraine war respectively. Zone counts are aircraft inside the box at observation time; the Hormuz box sits inside the wider Persian Gulf box, so the same aircraft can appear in both counts — do not sum zones.
+
+ADVERSARY ACTIVITY: Iranian, Russian, and Chinese aircraft visible on ADS-B are listed individually with callsign, type, altitude, and speed. Absence from this list is normal and must not be read as absence of activity — adversary forces frequently operate with transponders off, particularly during sensitive operations. When aircraft are listed, distinguish transport and patrol types on routine profiles from combat types in unusual positions.
+
+NEWS HEADLINES: context for interpreting the live picture — corroborate, don't speculate. If a headline and the aircraft data point the same direction, say so; if the data is quiet despite alarming headlines, say that too.
+
+TIMING AND TRENDS: each briefing is a one-hour snapshot, so frame observations accordingly. Prefer "currently tracking" and "at observation time" over language implying continuous surveillance. Time of day matters: a quiet picture during the US or European night is expected, not reassuring, and heavy training traffic during weekday daylight hours is baseline, not escalation. Where the data suggests a developing pattern — tankers repositioning toward a theater, ISR orbits establishing near a zone, transport flow into one region — describe it as developing rather than concluded.
+
+THE WATCH SENTENCE: the closing watch item must be concrete and falsifiable within 24 hours — a specific indicator to check (tanker count near a named theater, bomber activity resuming, adversary aircraft re-appearing in a named zone), not a generic "monitor the situation". Tie it to whichever indicator in the current data is closest to a threshold.
+
+STYLE:
+- Lead with the overall assessment, then specifics.
+- Use concrete numbers from the data; never invent counts, locations, or callsigns that are not in the user message.
+- Convey uncertainty honestly ("broadcasting", "visible", "tracked") rather than implying total knowledge of force posture.
+- No hedging boilerplate, no bullet lists, no headers — 3-4 short paragraphs of flowing analytic prose.
+
+Write a 3-4 paragraph intelligence briefing. Include: overall activity assessment, notable adversary movements if any, zone activity significance, and one sentence on what to watch for in the next 24 hours."""
+UA = {"User-Agent": "PikeClaw-OSINT/1.0"}
+
+class KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter with TCP keepalive on its sockets, so pooled connections
+    have a chance of surviving the hour-long sleep between cycles."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        opts = [(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+        if hasattr(socket, "TCP_KEEPIDLE"):
+            opts.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, 600))
+        if hasattr(socket, "TCP_KEEPINTVL"):
+            opts.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, 60))
+        kwargs["socket_options"] = opts
+        return super().init_poolmanager(*args, **kwargs)
+
+# One pooled session for the whole module so TCP+TLS handshakes are paid
+# once per host instead of once per request.
+SESSION = requests.Session()
+SESSION.mount("https://", KeepAliveAdapter(
+    pool_connections=4, pool_maxsize=20,
+    max_retries=Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504]),
+))
+
+# Hosts we hit every cycle — pinged between cycles so their sockets stay warm.
+KEEPALIVE_URLS = ("https://openrouter.ai/", "https://api.adsb.lol/")
+KEEPALIVE_INTERVAL = 300
+
+def _keepalive_loop():
+    while True:
+        time.sleep(KEEPALIVE_INTERVAL)
+        for url in KEEPALIVE_URLS:
+            try:
+                SESSION.head(url, headers=UA, timeout=10)
+            except Exception:
+                pass  # best-effort; the next real request reconnects anyway
+
+def start_keepalive_thread():
+    threading.Thread(target=_keepalive_loop, name="session-keepalive",
+                     daemon=True).start()
 
 def fetch_url(url, timeout=15):
     try:
-        req = urllib.request.Request(url, headers={"User-Agent": "PikeClaw-OSINT/1.0"})
-        with urllib.request.urlopen(req, timeout=timeout) as r:
-            return r.read().decode("utf-8")
+        r = SESSION.get(url, headers=UA, timeout=timeout)
+        r.raise_for_status()
+        return r.text
     except Exception as e:
         print(f"  fetch error {url[:60]}: {e}")
         return None
 
+@dataclass
+class AircraftBatch:
+    """One ADS-B poll in columnar (SoA) layout.
+
+    Numeric columns are NumPy arrays the classifier can mask directly;
+    string-ish columns stay Python lists (type codes, callsigns, and
+    alt_baro, which can be the string \"ground\").
+    """
+    hex_codes: np.ndarray   # int64 ICAO codes, -1 when unparseable
+    lat: np.ndarray         # float64, NaN when absent
+    lon: np.ndarray         # float64, NaN when absent
+    gs: np.ndarray          # float64 ground speed, NaN when absent
+    hex_str: list           # raw hex strings (callsign fallback)
+    t: list                 # raw type strings
+    flight: list            # callsigns
+    alt: list               # alt_baro, "?" when absent
+
+    def __len__(self):
+        return len(self.hex_str)
+
+def _batch_from_records(ac):
+    n = len(ac)
+    return AircraftBatch(
+        hex_codes=np.fromiter((_hex_to_int(a.get("hex", "")) for a in ac),
+                              dtype=np.int64, count=n),
+        lat=np.fromiter(((a.get("lat") or np.nan) for a in ac), dtype=np.float64, count=n),
+        lon=np.fromiter(((a.get("lon") or np.nan) for a in ac), dtype=np.float64, count=n),
+        gs=np.fromiter(((a.get("gs") or np.nan) for a in ac), dtype=np.float64, count=n),
+        hex_str=[a.get("hex", "") for a in ac],
+        t=[a.get("t") for a in ac],
+        flight=[a.get("flight") for a in ac],
+        alt=[a.get("alt_baro", "?") for a in ac],
+    )
+
 def fetch_aircraft():
-    data = fetch_url("https://api.adsb.lol/v2/mil")
-    if not data:
-        return []
     try:
-        return json.loads(data).get("ac", [])
+        # .content skips the str decode — the parser takes bytes directly.
+        raw = SESSION.get("https://api.adsb.lol/v2/mil", headers=UA, timeout=15).content
+    except Exception as e:
+        print(f"  fetch error api.adsb.lol: {e}")
+        return _batch_from_records([])
+    try:
+        ac = _json_loads(raw).get("ac", [])
     except:
-        return []
+        ac = []
+    return _batch_from_records(ac)
 
-def fetch_news():
-    sources = [
-        ("DEFNEWS", "https://www.defensenews.com/arc/outboundfeeds/rss/"),
-        ("REUTERS", "https://feeds.reuters.com/Reuters/worldNews"),
-        ("BBC ME",  "https://feeds.bbci.co.uk/news/world/middle_east/rss.xml"),
-    ]
-    headlines = []
-    for label, url in sources:
+# Fallback title scrape, compiled once at import and run over raw bytes so
+# only the matched titles ever get decoded.
+_TITLE_RE = re.compile(rb"<title><!\[CDATA\[(.*?)\]\]></title>|<title>(.*?)</title>", re.DOTALL)
+
+NEWS_SOURCES = [
+    ("DEFNEWS", "https://www.defensenews.com/arc/outboundfeeds/rss/"),
+    ("REUTERS", "https://feeds.reuters.com/Reuters/worldNews"),
+    ("BBC ME",  "https://feeds.bbci.co.uk/news/world/middle_east/rss.xml"),
+]
+
+# Raw feed bytes cached on tmpfs for a short TTL: daemon restarts, retries,
+# and an overlapping update_intel run all reuse the last good download.
+RSS_CACHE_DIR = "/dev/shm/pikeclaw_rss"
+RSS_CACHE_TTL = 1800
+
+def _rss_cache_path(url):
+    return os.path.join(RSS_CACHE_DIR, hashlib.sha1(url.encode()).hexdigest() + ".xml")
+
+def _read_rss_cache(url):
+    path = _rss_cache_path(url)
+    try:
+        if time.time() - os.path.getmtime(path) < RSS_CACHE_TTL:
+            with open(path, "rb") as f:
+                return f.read()
+    except OSError:
+        pass
+    return None
+
+def _write_rss_cache(url, raw):
+    try:
+        os.makedirs(RSS_CACHE_DIR, exist_ok=True)
+        path = _rss_cache_path(url)
+        tmp = f"{path}.tmp{os.getpid()}"
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)  # atomic — readers never see a partial file
+    except OSError:
+        pass
+
+def _extract_titles(raw, limit=7):
+    """Pull up to `limit` item titles out of raw RSS bytes."""
+    if HAS_LXML:
+        # Incremental C-level parse: stops as soon as we have enough items,
+        # never materializes the whole ~200KB document as a Python tree.
         try:
-            proxied = "https://api.allorigins.win/raw?url=" + urllib.parse.quote(url)
-            raw = fetch_url(proxied, timeout=10)
-            if not raw:
-                continue
-            import re
-            titles = re.findall(r"<title><!\[CDATA\[(.*?)\]\]></title>|<title>(.*?)</title>", raw)
-            for t1, t2 in titles[1:8]:  # skip feed title
-                title = (t1 or t2).strip()
-                if title and len(title) > 20:
-                    headlines.append(f"[{label}] {title}")
-        except Exception as e:
-            print(f"  news error {label}: {e}")
-    return headlines
+            titles = []
+            for _, el in etree.iterparse(BytesIO(raw), events=("end",), tag="{*}item"):
+                title = (el.findtext("{*}title") or "").strip()
+                el.clear()
+                if title:
+                    titles.append(title)
+                if len(titles) >= limit:
+                    break
+            return titles
+        except etree.XMLSyntaxError:
+            pass  # malformed feed — fall back to the regex scrape
+    titles = []
+    for t1, t2 in _TITLE_RE.findall(raw)[1:1 + limit]:  # skip feed title
+        title = (t1 or t2).decode("utf-8", "replace").strip()
+        if title:
+            titles.append(title)
+    return titles
+
+def fetch_one_feed(source):
+    """Fetch one RSS feed and extract its headlines."""
+    label, url = source
+    try:
+        raw = _read_rss_cache(url)
+        if raw is None:
+            # Feeds are fetched server-side here, so the allorigins.win CORS
+            # proxy (only needed in the browser) is just an extra round trip.
+            r = SESSION.get(url, headers=UA, timeout=10)
+            r.raise_for_status()  # an error page is not a feed
+            raw = r.content
+            # Only a confirmed 200 body may be cached — anything else would
+            # be served to every reader for the next 30 minutes.
+            if raw and r.status_code == 200:
+                _write_rss_cache(url, raw)
+        if not raw:
+            return []
+        return [f"[{label}] {t}" for t in _extract_titles(raw) if len(t) > 20]
+    except Exception as e:
+        print(f"  news error {label}: {e}")
+        return []
+
+def _title_tokens(headline):
+    # Strip the [SOURCE] tag so the same story from two feeds still matches.
+    return frozenset(re.findall(r"[a-z0-9']+",
+                                re.sub(r"^\[[^\]]+\]\s*", "", headline.lower())))
+
+def dedupe_headlines(headlines, threshold=0.6):
+    """Drop headlines whose token-set Jaccard overlap with an earlier kept
+    headline reaches `threshold` — different outlets reporting one event."""
+    kept, kept_tokens = [], []
+    for h in headlines:
+        tokens = _title_tokens(h)
+        if tokens and any(len(tokens & kt) / len(tokens | kt) >= threshold
+                          for kt in kept_tokens):
+            continue
+        kept.append(h)
+        kept_tokens.append(tokens)
+    return kept
 
-def analyze_aircraft(aircraft):
+def fetch_news():
+    # Feeds are network-bound, so fetch them all at once: wall time becomes
+    # the slowest feed instead of the sum of all of them.
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        results = list(ex.map(fetch_one_feed, NEWS_SOURCES))
+    return dedupe_headlines([h for feed in results for h in feed])
+
+# Country groups by ICAO 24-bit hex allocation, as small ids so the whole
+# fleet classifies with a few vectorized range comparisons.
+GROUP_NAMES = ("us", "iran", "russia", "china", "allied", "unknown")
+GROUP_RANGES = (
+    (0, 0xA00000, 0xAFFFFF),   # us
+    (1, 0x730000, 0x737FFF),   # iran
+    (2, 0x100000, 0x13FFFF),   # russia
+    (3, 0x780000, 0x7BFFFF),   # china
+)
+ADVERSARY_IDS = frozenset((1, 2, 3))
+
+def _hex_to_int(hex_str):
+    try:
+        return int(hex_str, 16)
+    except (TypeError, ValueError):
+        return -1  # unparseable transponder code
+
+# Type categories in priority order (first match wins), each compiled into
+# one alternation regex so classifying an aircraft is a handful of C-level
+# scans instead of ~40 Python-level substring tests.
+TYPE_PATTERNS = [
+    ("fighter",   ["F15","F16","F18","F22","F35","SU27","SU30","SU35","MIG29","J10","J11","J20","A10"]),
+    ("tanker",    ["KC10","KC46","KC135","KC130","MRTT","IL78"]),
+    ("bomber",    ["B52","B1","B2","TU95","TU160","H6"]),
+    ("recon",     ["P8","P3","RC135","E3","E6","U2","RQ4","MQ9","AWACS","E737"]),
+    ("transport", ["C17","C130","C30J","C5","IL76","AN124","Y20","A400"]),
+    ("heli",      ["UH60","AH64","CH47","CH53","MH60","MI17","MI24"]),
+]
+TYPE_RES = [(cat, re.compile("|".join(pats))) for cat, pats in TYPE_PATTERNS]
+
+def get_type(type_str):
+    t = (type_str or "").upper().replace(" ","").replace("-","")
+    for cat, rx in TYPE_RES:
+        if rx.search(t):
+            return cat
+    return "other"
+
+# Hour-over-hour the broadcasting fleet overlaps 60-80%, so classification
+# for a (hex, type) pair is memoized across polls. Keyed on both fields so
+# a hex that starts reporting a different type code re-classifies.
+_CLASSIFY_CACHE = OrderedDict()
+_CLASSIFY_CACHE_MAX = 4096
+
+def _cached_type(hex_str, type_str):
+    key = (hex_str, type_str)
+    hit = _CLASSIFY_CACHE.get(key)
+    if hit is not None:
+        _CLASSIFY_CACHE.move_to_end(key)
+        return hit
+    tp = get_type(type_str)
+    _CLASSIFY_CACHE[key] = tp
+    if len(_CLASSIFY_CACHE) > _CLASSIFY_CACHE_MAX:
+        _CLASSIFY_CACHE.popitem(last=False)
+    return tp
+
+ZONES = [
+    ("Strait of Hormuz",  25.5, 55.5, 27.5, 57.5),
+    ("Persian Gulf",      24.0, 48.0, 30.0, 56.0),
+    ("Taiwan Strait",     22.0, 117.0,26.0,121.0),
+    ("South China Sea",   5.0, 108.0, 18.0,121.0),
+    ("Black Sea",         41.0, 27.0, 47.0, 42.0),
+]
+# (Z, 4) box array: lat1, lon1, lat2, lon2 — lets a single broadcast test
+# every aircraft against every zone at once.
+ZONE_BOXES = np.array([z[1:] for z in ZONES], dtype=np.float64)
+GROUP_RANGE_ARR = np.array([[lo, hi] for _, lo, hi in GROUP_RANGES], dtype=np.int64)
+
+def _classify_kernel(hex_arr, lat, lon, group_ranges, zone_boxes):
+    """Country ids + per-zone occupancy in one pass over positioned aircraft.
+
+    NumPy implementation; swapped for a numba-compiled loop below when
+    numba is installed.
+    """
+    group_ids = np.full(hex_arr.shape[0], 4, dtype=np.int8)  # default: allied
+    for gid in range(group_ranges.shape[0]):
+        in_range = (hex_arr >= group_ranges[gid, 0]) & (hex_arr <= group_ranges[gid, 1])
+        group_ids[in_range] = gid
+    group_ids[hex_arr < 0] = 5  # unknown
+    in_zone = ((lat[None, :] >= zone_boxes[:, 0:1]) & (lon[None, :] >= zone_boxes[:, 1:2]) &
+               (lat[None, :] <= zone_boxes[:, 2:3]) & (lon[None, :] <= zone_boxes[:, 3:4]))
+    return group_ids, in_zone.sum(axis=1)
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _classify_kernel(hex_arr, lat, lon, group_ranges, zone_boxes):  # noqa: F811
+        n = hex_arr.shape[0]
+        group_ids = np.full(n, 4, dtype=np.int8)
+        zone_counts = np.zeros(zone_boxes.shape[0], dtype=np.int64)
+        for i in range(n):
+            h = hex_arr[i]
+            if h < 0:
+                group_ids[i] = 5
+            else:
+                for g in range(group_ranges.shape[0]):
+                    if group_ranges[g, 0] <= h <= group_ranges[g, 1]:
+                        group_ids[i] = g
+                        break
+            for z in range(zone_boxes.shape[0]):
+                if (zone_boxes[z, 0] <= lat[i] <= zone_boxes[z, 2]
+                        and zone_boxes[z, 1] <= lon[i] <= zone_boxes[z, 3]):
+                    zone_counts[z] += 1
+        return group_ids, zone_counts
+
+def analyze_aircraft(batch):
     """Produce a structured summary of current military aircraft activity."""
-    if not aircraft:
+    if not len(batch):
         return {}
 
-    # Country ranges
-    def get_group(hex_str):
-        try:
-            h = int(hex_str, 16)
-        except:
-            return "unknown"
-        if 0xA00000 <= h <= 0xAFFFFF: return "us"
-        if 0x730000 <= h <= 0x737FFF: return "iran"
-        if 0x100000 <= h <= 0x13FFFF: return "russia"
-        if 0x780000 <= h <= 0x7BFFFF: return "china"
-        return "allied"
-
-    def get_type(ac):
-        t = (ac.get("t") or "").upper().replace(" ","").replace("-","")
-        fighters   = ["F15","F16","F18","F22","F35","SU27","SU30","SU35","MIG29","J10","J11","J20","A10"]
-        transports = ["C17","C130","C30J","C5","IL76","AN124","Y20","A400"]
-        tankers    = ["KC10","KC46","KC135","KC130","MRTT","IL78"]
-        recon      = ["P8","P3","RC135","E3","E6","U2","RQ4","MQ9","AWACS","E737"]
-        bombers    = ["B52","B1","B2","TU95","TU160","H6"]
-        helis      = ["UH60","AH64","CH47","CH53","MH60","MI17","MI24"]
-        for p in fighters:
-            if p in t: return "fighter"
-        for p in tankers:
-            if p in t: return "tanker"
-        for p in bombers:
-            if p in t: return "bomber"
-        for p in recon:
-            if p in t: return "recon"
-        for p in transports:
-            if p in t: return "transport"
-        for p in helis:
-            if p in t: return "heli"
-        return "other"
-
-    positioned = [a for a in aircraft if a.get("lat") and a.get("lon")]
+    # Positioned aircraft only — everything below indexes through `idx`.
+    idx = np.flatnonzero(np.isfinite(batch.lat) & np.isfinite(batch.lon))
+    lat = batch.lat[idx]
+    lon = batch.lon[idx]
+    hex_arr = batch.hex_codes[idx]
+
+    group_ids, zone_counts = _classify_kernel(hex_arr, lat, lon,
+                                              GROUP_RANGE_ARR, ZONE_BOXES)
+
     counts = {"us":0,"iran":0,"russia":0,"china":0,"allied":0}
+    for gid, c in zip(*np.unique(group_ids, return_counts=True)):
+        name = GROUP_NAMES[gid]
+        counts[name] = counts.get(name, 0) + int(c)
+
     types  = {"fighter":0,"tanker":0,"recon":0,"bomber":0,"transport":0,"heli":0,"other":0}
     adversary_details = []
-
-    for ac in positioned:
-        grp = get_group(ac.get("hex",""))
-        tp  = get_type(ac)
-        counts[grp] = counts.get(grp, 0) + 1
-        types[tp]   = types.get(tp, 0) + 1
-        if grp in ("iran","russia","china"):
+    for k, i in enumerate(idx):
+        types[_cached_type(batch.hex_str[i], batch.t[i])] += 1
+        # Only the first 20 adversary rows are ever reported — don't build
+        # detail dicts past that.
+        if group_ids[k] in ADVERSARY_IDS and len(adversary_details) < 20:
+            gs = batch.gs[i]
             adversary_details.append({
-                "country": grp,
-                "callsign": (ac.get("flight") or "").strip() or ac.get("hex",""),
-                "type": ac.get("t","?"),
-                "alt": ac.get("alt_baro","?"),
-                "speed": round(ac.get("gs",0)) if ac.get("gs") else "?",
-                "lat": round(ac.get("lat",0),2),
-                "lon": round(ac.get("lon",0),2),
+                "country": GROUP_NAMES[group_ids[k]],
+                "callsign": (batch.flight[i] or "").strip() or batch.hex_str[i],
+                "type": batch.t[i] if batch.t[i] is not None else "?",
+                "alt": batch.alt[i],
+                "speed": round(float(gs)) if np.isfinite(gs) else "?",
+                "lat": round(float(lat[k]), 2),
+                "lon": round(float(lon[k]), 2),
             })
 
-    # Zone checks
-    ZONES = [
-        ("Strait of Hormuz",  25.5, 55.5, 27.5, 57.5),
-        ("Persian Gulf",      24.0, 48.0, 30.0, 56.0),
-        ("Taiwan Strait",     22.0, 117.0,26.0,121.0),
-        ("South China Sea",   5.0, 108.0, 18.0,121.0),
-        ("Black Sea",         41.0, 27.0, 47.0, 42.0),
-    ]
-    zone_activity = []
-    for name, lat1, lon1, lat2, lon2 in ZONES:
-        in_zone = [a for a in positioned
-                   if lat1<=a.get("lat",0)<=lat2 and lon1<=a.get("lon",0)<=lon2]
-        if in_zone:
-            zone_activity.append(f"{name}: {len(in_zone)} aircraft")
-
-    return {
-        "total": len(positioned),
+    zone_activity = [f"{zone[0]}: {int(c)} aircraft"
+                     for zone, c in zip(ZONES, zone_counts) if c]
+
+    analysis = {
+        "total": int(len(idx)),
         "counts": counts,
         "types": types,
-        "adversary_details": adversary_details[:20],
+        "adversary_details": adversary_details,
         "zone_activity": zone_activity,
         "tankers": types["tanker"],
         "bombers": types["bomber"],
         "recon": types["recon"],
     }
+    analysis["threat_level"] = compute_threat_level(analysis)
+    return analysis
+
+def compute_threat_level(analysis):
+    """Single source of truth for the threat ladder.
+
+    Previously run_once and generate_briefing_local each had their own
+    (slightly different) rules; this merges them so the published
+    threat_level and the briefing text can never disagree.
+    """
+    counts = analysis.get("counts", {})
+    types = analysis.get("types", {})
+    zones = analysis.get("zone_activity", [])
+    bombers = types.get("bomber", 0)
+    adversaries = (counts.get("iran", 0) + counts.get("russia", 0)
+                   + counts.get("china", 0))
+    if bombers >= 2 and zones:
+        return "HIGH"
+    if bombers >= 1 or zones or adversaries >= 3:
+        return "ELEVATED"
+    if types.get("tanker", 0) >= 3 or types.get("recon", 0) >= 2:
+        return "GUARDED"
+    return "LOW"
+
+def _briefing_cache_key(analysis, headlines):
+    """Content hash of the prompt inputs — same situation, same key."""
+    adv = analysis.get("adversary_details", [])
+    material = {
+        "c": analysis.get("counts", {}),
+        "t": analysis.get("types", {}),
+        "z": analysis.get("zone_activity", []),
+        "h": headlines[:10],
+        "adv": sorted(a["callsign"] for a in adv),
+    }
+    return hashlib.blake2b(
+        json.dumps(material, sort_keys=True).encode(), digest_size=16
+    ).hexdigest()
+
+def _load_ai_cache():
+    try:
+        with open(AI_CACHE_FILE) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def _save_ai_cache(cache):
+    now = time.time()
+    cache = {k: v for k, v in cache.items() if now - v.get("ts", 0) < AI_CACHE_EVICT}
+    try:
+        os.makedirs(os.path.dirname(AI_CACHE_FILE), exist_ok=True)
+        with open(AI_CACHE_FILE, "w") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        print(f"  cache write error: {e}")
 
 def generate_briefing_ai(analysis, headlines):
     """Call OpenRouter to generate the actual briefing text."""
     if not OPENROUTER_KEY:
         return generate_briefing_local(analysis, headlines)
 
+    # If the situation hasn't changed since the last call, reuse the cached
+    # completion instead of paying OpenRouter latency + tokens again.
+    key = _briefing_cache_key(analysis, headlines)
+    cache = _load_ai_cache()
+    hit = cache.get(key)
+    if hit and time.time() - hit.get("ts", 0) < AI_CACHE_TTL:
+        print("  AI briefing: cache hit, skipping OpenRouter call")
+        return hit["text"]
+
     adv = analysis.get("adversary_details", [])
     zones = analysis.get("zone_activity", [])
     counts = analysis.get("counts", {})
     types = analysis.get("types", {})
 
-    prompt = f"""You are a military OSINT analyst. Generate a concise, objective intelligence briefing based on the following live data. Be analytical, not alarmist. Use plain language. No markdown headers — just 3-4 short paragraphs. Be specific about numbers and locations.
-
-LIVE AIRCRAFT DATA ({analysis.get('total',0)} aircraft tracked):
+    volatile_data = f"""LIVE AIRCRAFT DATA ({analysis.get('total',0)} aircraft tracked):
 - US: {counts.get('us',0)}, Iran: {counts.get('iran',0)}, Russia: {counts.get('russia',0)}, China: {counts.get('china',0)}, Allied: {counts.get('allied',0)}
 - Tankers airborne: {types.get('tanker',0)} (high tanker count = extended ops being prepared)
 - ISR/Recon airborne: {types.get('recon',0)}
@@ -167,32 +547,47 @@ ACTIVE ALERT ZONES:
 {chr(10).join(zones) if zones else "No aircraft in monitored zones"}
 
 RECENT NEWS HEADLINES:
-{chr(10).join(headlines[:10]) if headlines else "No headlines available"}
-
-Write a 3-4 paragraph intelligence briefing. Include: overall activity assessment, notable adversary movements if any, zone activity significance, and one sentence on what to watch for in the next 24 hours."""
+{chr(10).join(headlines[:10]) if headlines else "No headlines available"}"""
 
     payload = {
         "model": "openrouter/anthropic/claude-sonnet-4.6",
-        "messages": [{"role": "user", "content": prompt}],
+        # The instruction preamble is byte-identical across hourly calls, so
+        # it carries a cache_control breakpoint: Anthropic (via OpenRouter)
+        # caches the prefix and only the volatile data block is billed fresh.
+        "messages": [
+            {
+                "role": "system",
+                "content": [{
+                    "type": "text",
+                    "text": STATIC_ANALYST_INSTRUCTIONS,
+                    "cache_control": {"type": "ephemeral"},
+                }],
+            },
+            {"role": "user", "content": volatile_data},
+        ],
         "max_tokens": 500,
         "temperature": 0.3,
+        # Lets upstream provider-side prompt caching key off the same inputs.
+        "prompt_cache_key": key,
     }
 
     try:
-        data = json.dumps(payload).encode()
-        req = urllib.request.Request(
+        r = SESSION.post(
             "https://openrouter.ai/api/v1/chat/completions",
-            data=data,
+            json=payload,
             headers={
                 "Authorization": f"Bearer {OPENROUTER_KEY}",
-                "Content-Type": "application/json",
                 "HTTP-Referer": "https://rpike623.github.io/mil-tracker/",
                 "X-Title": "PikeClaw OSINT Tracker",
-            }
+            },
+            timeout=30,
         )
-        with urllib.request.urlopen(req, timeout=30) as r:
-            result = json.loads(r.read().decode())
-            return result["choices"][0]["message"]["content"].strip()
+        r.raise_for_status()
+        result = r.json()
+        text = result["choices"][0]["message"]["content"].strip()
+        cache[key] = {"ts": time.time(), "text": text}
+        _save_ai_cache(cache)
+        return text
     except Exception as e:
         print(f"  AI briefing error: {e}")
         return generate_briefing_local(analysis, headlines)
@@ -205,11 +600,7 @@ def generate_briefing_local(analysis, headlines):
     adv    = analysis.get("adversary_details", [])
     total  = analysis.get("total", 0)
 
-    threat = "LOW"
-    if types.get("bomber",0) >= 1: threat = "ELEVATED"
-    if counts.get("iran",0) + counts.get("russia",0) + counts.get("china",0) >= 3: threat = "ELEVATED"
-    if zones: threat = "ELEVATED"
-    if types.get("bomber",0) >= 2 and zones: threat = "HIGH"
+    threat = analysis.get("threat_level") or compute_threat_level(analysis)
 
     lines = []
     lines.append(f"THREAT ASSESSMENT: {threat}. Currently tracking {total} military aircraft globally across all monitored nations. "
@@ -237,18 +628,99 @@ def generate_briefing_local(analysis, headlines):
 
     return "\n\n".join(lines)
 
+_BRIEFING_SHA = None  # GitHub blob sha of briefing.json, cached while the daemon lives
+
+def _github_token():
+    global GITHUB_TOKEN
+    if GITHUB_TOKEN:
+        return GITHUB_TOKEN
+    GITHUB_TOKEN = os.environ.get("GITHUB_TOKEN", "")
+    if not GITHUB_TOKEN:
+        try:
+            out = subprocess.run(["git", "config", "--get", "github.token"],
+                                 cwd=REPO_DIR, capture_output=True, text=True)
+            GITHUB_TOKEN = out.stdout.strip()
+        except OSError:
+            GITHUB_TOKEN = ""
+    return GITHUB_TOKEN
+
+def _push_via_api(json_bytes, message, token):
+    """PUT briefing.json through the GitHub contents API on the warm session.
+
+    One GET fetches the blob sha the first time; after that each hourly
+    update is a single keep-alive HTTPS PUT instead of a git subprocess
+    doing its full protocol handshake.
+    """
+    global _BRIEFING_SHA
+    api_url = f"https://api.github.com/repos/{REPO}/contents/briefing.json"
+    headers = {"Authorization": f"token {token}", **UA}
+    if _BRIEFING_SHA is None:
+        r = SESSION.get(api_url, headers=headers, timeout=30)
+        if r.status_code == 200:
+            _BRIEFING_SHA = r.json().get("sha")
+    body = {"message": message, "content": base64.b64encode(json_bytes).decode()}
+    if _BRIEFING_SHA:
+        body["sha"] = _BRIEFING_SHA
+    try:
+        r = SESSION.put(api_url, json=body, headers=headers, timeout=30)
+        r.raise_for_status()
+    except Exception:
+        # A failed PUT usually means the cached blob sha went stale (409
+        # after an out-of-band push); drop it so the next attempt re-GETs.
+        _BRIEFING_SHA = None
+        raise
+    _BRIEFING_SHA = r.json()["content"]["sha"]
+
+def _briefing_digest(briefing_data):
+    """Hash of the briefing minus its timestamps — what 'changed' means."""
+    stable = {k: v for k, v in briefing_data.items()
+              if k not in ("generated_utc", "generated_ts")}
+    return hashlib.blake2b(json.dumps(stable, sort_keys=True).encode()).hexdigest()
+
 def save_and_commit(briefing_data):
-    with open(BRIEFING_FILE, "w") as f:
-        json.dump(briefing_data, f, indent=2)
+    payload = _json_dumps_bytes(briefing_data)
+    with open(BRIEFING_FILE, "wb") as f:
+        f.write(payload)
     print("  Saved briefing.json")
 
+    # Most hours the briefing only differs in its timestamps; spawning
+    # three git subprocesses plus a push to GitHub for that is wasted work.
+    digest = _briefing_digest(briefing_data)
+    try:
+        with open(LAST_SHA_FILE) as f:
+            last_digest = f.read().strip()
+    except OSError:
+        last_digest = None
+    if digest == last_digest:
+        print("  Briefing unchanged — skipping commit/push")
+        return
+
+    message = f"📡 Auto briefing {briefing_data['generated_utc']}"
+    token = _github_token()
+    if token:
+        try:
+            _push_via_api(payload, message, token)
+            with open(LAST_SHA_FILE, "w") as f:
+                f.write(digest)
+            print("  Pushed to GitHub (contents API)")
+            return
+        except Exception as e:
+            print(f"  GitHub API error, falling back to git: {e}")
+
     try:
-        subprocess.run(["git", "add", "briefing.json"],
-                       cwd="/root/.openclaw/workspace/mil-tracker", check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", f"📡 Auto briefing {briefing_data['generated_utc']}"],
-                       cwd="/root/.openclaw/workspace/mil-tracker", check=True, capture_output=True)
-        subprocess.run(["git", "push", "origin", "main"],
-                       cwd="/root/.openclaw/workspace/mil-tracker", check=True, capture_output=True)
+        # Single shell so add/commit/push share one fork-exec. Commits made
+        # through the contents API leave this clone behind origin/main, so
+        # rebase onto origin before pushing; on a briefing.json conflict the
+        # local commit being replayed wins (-X theirs under rebase).
+        subprocess.run(
+            ["bash", "-c",
+             "git add briefing.json && "
+             f"git commit -m '{message}' && "
+             "git pull --rebase -X theirs origin main && "
+             "git push origin main"],
+            cwd=REPO_DIR, check=True, capture_output=True)
+        with open(LAST_SHA_FILE, "w") as f:
+            f.write(digest)
         print("  Pushed to GitHub")
     except subprocess.CalledProcessError as e:
         print(f"  Git error: {e.stderr.decode() if e.stderr else e}")
@@ -274,8 +746,7 @@ def run_once():
     briefing = {
         "generated_utc": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
         "generated_ts": int(now.timestamp()),
-        "threat_level": "ELEVATED" if (analysis.get("bombers",0)>=1 or analysis.get("zone_activity")) else
-                        "GUARDED"  if (analysis.get("tankers",0)>=3 or analysis.get("recon",0)>=2) else "LOW",
+        "threat_level": analysis.get("threat_level", "LOW"),
         "summary": text,
         "stats": {
             "total": analysis.get("total",0),
@@ -294,6 +765,7 @@ def run_once():
 if __name__ == "__main__":
     # Run immediately, then every 60 minutes
     print("PikeClaw OSINT Briefing Daemon starting...")
+    start_keepalive_thread()
     while True:
         try:
             run_once()
@@ -18,19 +18,48 @@ import json
 import os
 import re
 import sys
-import requests
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 
 try:
-    import feedparser
-    HAS_FEEDPARSER = True
+    import orjson
 except ImportError:
-    HAS_FEEDPARSER = False
-    print('  feedparser not available — install with: pip install feedparser')
+    orjson = None
 
 DATA_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'intel-data.json')
 
 HEADERS = {'User-Agent': 'PikeClaw-OSINT-Bot/1.0 (https://rpike623.github.io/mil-tracker)'}
+
+# Heavy deps are imported at first use: on a cold CI runner `import
+# requests` alone is hundreds of ms, wasted whenever a code path that
+# never fetches runs. sys.modules memoizes repeat imports; lru_cache
+# memoizes the session/warning.
+
+@lru_cache(maxsize=None)
+def _get_session():
+    """Shared pooled session — amortizes TCP/TLS handshakes across fetches."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(
+        pool_connections=16, pool_maxsize=16,
+        max_retries=Retry(total=2, backoff_factor=0.3),
+    ))
+    return session
+
+
+@lru_cache(maxsize=None)
+def _get_feedparser():
+    try:
+        import feedparser
+        return feedparser
+    except ImportError:
+        print('  feedparser not available — install with: pip install feedparser')
+        return None
 FIRMS_MAP_KEY = 'b8a5882409f4bafebdebc9b4c3c0a6a0'
 FIRMS_ZONES = [
     (43, 24, 65, 40, 'Iran'),
@@ -73,12 +102,59 @@ CONFLICT_KW = [
 ]
 
 
+# Conditional-GET state per feed URL: validator headers plus the items
+# parsed from the last 200, so a 304 costs neither bytes nor parse time.
+FEED_CACHE_PATH = os.path.join(tempfile.gettempdir(), 'pikeclaw_feed_cache.json')
+_FEED_CACHE = None
+_FEED_CACHE_LOCK = threading.Lock()
+
+
+def _feed_cache():
+    global _FEED_CACHE
+    with _FEED_CACHE_LOCK:
+        if _FEED_CACHE is None:
+            try:
+                with open(FEED_CACHE_PATH) as f:
+                    _FEED_CACHE = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                _FEED_CACHE = {}
+    return _FEED_CACHE
+
+
+def _save_feed_cache():
+    try:
+        with open(FEED_CACHE_PATH, 'w') as f:
+            json.dump(_feed_cache(), f)
+    except OSError:
+        pass
+
+
 def fetch_feed(src):
     """Fetch and parse a single RSS feed."""
-    if not HAS_FEEDPARSER:
+    feedparser = _get_feedparser()
+    if feedparser is None:
         return []
     try:
-        feed = feedparser.parse(src['url'])
+        cache = _feed_cache()
+        cached = cache.get(src['url'], {})
+        headers = dict(HEADERS)
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('modified'):
+            headers['If-Modified-Since'] = cached['modified']
+
+        # Fetch the bytes ourselves so the pooled session is reused and
+        # feedparser skips its own (serial, un-pooled) urllib fetch.
+        resp = _get_session().get(src['url'], headers=headers, timeout=8)
+        if resp.status_code == 304 and 'items' in cached:
+            return cached['items']
+        if resp.status_code != 200:
+            # Error body isn't a feed — keep the last good validators and
+            # items rather than overwriting them with an empty entry.
+            print(f'  Warning: {src["label"]} returned HTTP {resp.status_code}')
+            return cached.get('items', [])
+
+        feed = feedparser.parse(resp.content)
         items = []
         for entry in feed.entries[:10]:
             title = entry.get('title', '').strip()
@@ -90,37 +166,69 @@ def fetch_feed(src):
                 'published': entry.get('published', ''),
                 'source': src['label'],
             })
+        cache[src['url']] = {
+            'etag': resp.headers.get('ETag'),
+            'modified': resp.headers.get('Last-Modified'),
+            'items': items,
+        }
         return items
     except Exception as e:
         print(f'  Warning: Failed to fetch {src["label"]}: {e}')
         return []
 
 
+# Each keyword list compiled once into a single alternation, so a title is
+# categorized in three C-level scans instead of ~45 Python substring tests.
+CATEGORY_RES = [
+    ('deployment', re.compile('|'.join(re.escape(k) for k in DEPLOYMENT_KW), re.I)),
+    ('exercise',   re.compile('|'.join(re.escape(k) for k in EXERCISE_KW), re.I)),
+    ('conflict',   re.compile('|'.join(re.escape(k) for k in CONFLICT_KW), re.I)),
+]
+
+
 def categorize(title):
-    t = title.lower()
-    cats = []
-    if any(k in t for k in DEPLOYMENT_KW):
-        cats.append('deployment')
-    if any(k in t for k in EXERCISE_KW):
-        cats.append('exercise')
-    if any(k in t for k in CONFLICT_KW):
-        cats.append('conflict')
-    return cats
+    return [cat for cat, rx in CATEGORY_RES if rx.search(title)]
+
+
+def _dedupe_items(items, threshold=0.6):
+    """Drop articles whose title token-set Jaccard overlap with an earlier
+    kept article reaches `threshold` — the same event from several outlets."""
+    kept, kept_tokens = [], []
+    for item in items:
+        tokens = frozenset(re.findall(r"[a-z0-9']+", item['title'].lower()))
+        if tokens and any(len(tokens & kt) / len(tokens | kt) >= threshold
+                          for kt in kept_tokens):
+            continue
+        kept.append(item)
+        kept_tokens.append(tokens)
+    return kept
 
 
 def fetch_all_news():
-    """Pull all feeds and categorize articles."""
+    """Pull all feeds, drop near-duplicate stories, and categorize articles.
+
+    Returns (all_items, by_category) — the per-category lists are built in
+    the same pass that tags each item, so callers don't re-filter.
+    """
     all_items = []
-    for src in NEWS_FEEDS:
-        items = fetch_feed(src)
+    by_category = {'deployment': [], 'exercise': [], 'conflict': []}
+    with ThreadPoolExecutor(max_workers=8) as ex:
+        results = list(ex.map(fetch_feed, NEWS_FEEDS))
+    _save_feed_cache()
+    raw_items = []
+    for src, items in zip(NEWS_FEEDS, results):
         print(f'  {src["label"]}: {len(items)} items')
-        for item in items:
-            item['categories'] = categorize(item['title'])
-            all_items.append(item)
+        raw_items.extend(items)
+    for item in _dedupe_items(raw_items):
+        cats = categorize(item['title'])
+        item['categories'] = cats
+        for cat in cats:
+            by_category[cat].append(item)
+        all_items.append(item)
 
     # Sort by relevance — articles with categories first
     all_items.sort(key=lambda x: (len(x['categories']) == 0, x.get('published', '')))
-    return all_items
+    return all_items, by_category
 
 
 # ─────────────────────────────────────────
@@ -132,7 +240,7 @@ def fetch_gps_status():
     """Check gpsjam.org for active jamming regions (best-effort)."""
     try:
         # gpsjam doesn't have a public API but we can pull their latest GeoJSON
-        r = requests.get('https://gpsjam.org/map.json', headers=HEADERS, timeout=8)
+        r = _get_session().get('https://gpsjam.org/map.json', headers=HEADERS, timeout=8)
         if r.status_code == 200:
             data = r.json()
             print(f'  gpsjam.org: fetched {len(data)} records')
@@ -224,7 +332,7 @@ def fetch_firms_hotspots():
         for src in sources:
             url = f'https://firms.modaps.eosdis.nasa.gov/api/area/csv/{FIRMS_MAP_KEY}/{src}/{west},{south},{east},{north}/1'
             try:
-                r = requests.get(url, headers=HEADERS, timeout=20)
+                r = _get_session().get(url, headers=HEADERS, timeout=20)
                 if r.status_code != 200:
                     continue
                 lines = [ln for ln in r.text.strip().splitlines() if ln.strip()]
@@ -307,12 +415,12 @@ def main():
 
     # ── 1. News feeds
     print('[ 1/3 ] Fetching news feeds...')
-    news_items = fetch_all_news()
+    news_items, by_category = fetch_all_news()
     print(f'        Total: {len(news_items)} articles')
 
-    deployment_news = [i for i in news_items if 'deployment' in i.get('categories', [])]
-    conflict_news   = [i for i in news_items if 'conflict' in i.get('categories', [])]
-    exercise_news   = [i for i in news_items if 'exercise' in i.get('categories', [])]
+    deployment_news = by_category['deployment']
+    conflict_news   = by_category['conflict']
+    exercise_news   = by_category['exercise']
 
     print(f'        Deployment: {len(deployment_news)} | Conflict: {len(conflict_news)} | Exercise: {len(exercise_news)}')
 
@@ -348,9 +456,14 @@ def main():
     print(f'        Version: {data["version"]}')
     print(f'        Timestamp: {data["generated_utc"]}')
 
-    # Write
-    with open(DATA_PATH, 'w') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    # Write — intel-data.json runs to several MB; orjson serializes it in
+    # one C pass and a single write when available.
+    if orjson is not None:
+        with open(DATA_PATH, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(DATA_PATH, 'w') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
 
     size_kb = os.path.getsize(DATA_PATH) / 1024
     print(f'\n✅ Written {size_kb:.1f} KB to intel-data.json')